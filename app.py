@@ -7,18 +7,26 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
+import os
 from datetime import datetime, timedelta
 import time
 import threading
-from typing import Dict, List
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from heapq import nlargest
+from operator import itemgetter
+from typing import Dict, List, NamedTuple, Tuple
 import config
 import utils
-from fail2ban_manager import Fail2banManager
+from fail2ban_manager import Fail2banManager, JailStatus
 import performance_config
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Optional imports for map functionality
 try:
     import folium
+    from folium.plugins import MarkerCluster
     from streamlit_folium import st_folium
     MAP_AVAILABLE = True
 except ImportError:
@@ -33,131 +41,517 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_data(show_spinner=False)
+def _load_css() -> str:
+    """Custom stylesheet, read from disk once per process"""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'styles.css'), encoding='utf-8') as css_file:
+        return css_file.read()
+
 # Custom CSS for modern UI
-st.markdown("""
-<style>
-    .main-header {
-        background: linear-gradient(90deg, #1f77b4 0%, #dc3545 100%);
-        padding: 1rem;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
+st.markdown(f"<style>{_load_css()}</style>", unsafe_allow_html=True)
+
+def _geolocate(ips) -> Dict[str, Dict]:
+    """Resolve each unique IP once and return an IP -> geolocation mapping"""
+    # The bulk lookup deduplicates, answers local addresses and batches the rest
+    return utils.get_ip_geolocation_bulk(list(ips))
+
+@st.cache_resource
+def _get_manager() -> Fail2banManager:
+    """Fail2ban manager shared by every session, so its own caches outlive a rerun"""
+    return Fail2banManager()
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _fetch_is_running() -> bool:
+    """Whether the fail2ban server answers, rechecked at most every few seconds"""
+    return _get_manager().is_fail2ban_running()
+
+@st.cache_data(ttl=performance_config.CACHE_DURATION, show_spinner=False)
+def _fetch_jails_status() -> Tuple[datetime, List[JailStatus]]:
+    """Status of all jails, shared by every session until the TTL expires"""
+    return datetime.now(), _get_manager().get_all_jails_status()
+
+@st.cache_data(ttl=performance_config.CACHE_DURATION, show_spinner=False)
+def _fetch_banned_ips() -> Dict[str, List[str]]:
+    """Banned IPs by jail, shared by every session until the TTL expires"""
+    return _get_manager().get_banned_ips()
+
+@st.cache_data(ttl=performance_config.CACHE_DURATION, show_spinner=False)
+def _fetch_server_status() -> Dict:
+    """Overall server status, shared by every session until the TTL expires"""
+    # Reuse the cached jail statuses instead of querying every jail a second time
+    return _get_manager().get_server_status(_fetch_jails_status()[1])
+
+@st.cache_data(ttl=performance_config.CACHE_DURATION, show_spinner=False)
+def _fetch_jail_config(jail_name: str) -> Dict:
+    """Configuration of a jail, shared by every session until the TTL expires"""
+    return _get_manager().get_jail_config(jail_name)
+
+def _bans_frame(banned_ips: Dict[str, List[str]]) -> pd.DataFrame:
+    """Banned IPs flattened into one (jail, ip) row per ban"""
+    return pd.DataFrame(
+        [(jail, ip) for jail, ips in banned_ips.items() for ip in ips],
+        columns=['jail', 'ip']
+    )
+
+@st.cache_data(ttl=performance_config.CACHE_DURATION, show_spinner=False)
+def _build_failures_fig(jail_rows: Tuple[Tuple[str, int, int], ...]) -> go.Figure:
+    """Bar chart of failures and current bans from (jail, failures, banned) rows"""
+    # One structured array holds the three trace columns
+    rows = np.array(list(jail_rows), dtype=[('name', object), ('failures', np.int64), ('banned', np.int64)])
+    
+    fig_failures = go.Figure()
+    
+    # Add bars for total failures
+    fig_failures.add_trace(go.Bar(
+        y=rows['name'],
+        x=rows['failures'],
+        name='Tentatives totales',
+        orientation='h',
+        marker_color='#dc3545',
+        texttemplate='%{x:,}',
+        textposition='auto',
+        hovertemplate="<b>%{y}</b><br>Tentatives: %{x:,}<extra></extra>"
+    ))
+    
+    # Add bars for currently banned
+    fig_failures.add_trace(go.Bar(
+        y=rows['name'],
+        x=rows['banned'],
+        name='IPs bannies actuellement',
+        orientation='h',
+        marker_color='#ffc107',
+        text=np.where(rows['banned'] > 0, rows['banned'].astype(str), ''),
+        textposition='auto',
+        hovertemplate="<b>%{y}</b><br>IPs bannies: %{x}<extra></extra>"
+    ))
+    
+    fig_failures.update_layout(
+        title="Activité de sécurité par service",
+        xaxis_title="Nombre",
+        yaxis_title="Services",
+        barmode='overlay',
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        height=400
+    )
+    return fig_failures
+
+@st.cache_data(ttl=performance_config.CACHE_DURATION, show_spinner=False)
+def _build_sunburst_fig(frozen_items: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> go.Figure:
+    """Sunburst of banned IPs from hashable (jail, ips) pairs"""
+    # Root, then jails as children of root, then IPs as children of jails
+    labels = ["IPs Bannies"]
+    parents = [""]
+    values = [sum(len(ips) for _, ips in frozen_items)]
+    
+    for jail, ips in frozen_items:
+        labels.append(jail)
+        parents.append("IPs Bannies")
+        values.append(len(ips))
+        
+        labels.extend(ips)
+        parents.extend([jail] * len(ips))
+        values.extend([1] * len(ips))
+    
+    fig_banned = go.Figure(go.Sunburst(
+        labels=labels,
+        parents=parents,
+        values=values,
+    ))
+    
+    # Update layout for tight margin
+    fig_banned.update_layout(
+        margin=dict(t=30, l=0, r=0, b=0),
+        title="Distribution des IPs bannies",
+        height=400
+    )
+    return fig_banned
+
+@st.cache_data(ttl=performance_config.CACHE_DURATION, show_spinner=False)
+def _build_attackers_fig(attackers: Tuple[Tuple[str, int, str], ...]) -> go.Figure:
+    """Bar chart of the top attacking IPs from (ip, attempts, hover text) rows"""
+    fig_attackers = go.Figure(data=[go.Bar(
+        x=[ip for ip, _, _ in attackers],
+        y=[attempts for _, attempts, _ in attackers],
+        marker_color='#dc3545',
+        hovertemplate="%{customdata}<extra></extra>",
+        customdata=[hover_text for _, _, hover_text in attackers]
+    )])
+    
+    fig_attackers.update_layout(
+        title="Top 10 IPs Attaquantes",
+        xaxis_title="Adresses IP",
+        yaxis_title="Nombre de tentatives",
+        xaxis_tickangle=-45
+    )
+    return fig_attackers
+
+@st.cache_data(ttl=performance_config.CACHE_DURATION, show_spinner=False)
+def _build_failure_types_fig(failure_types: Tuple[Tuple[str, int], ...]) -> go.Figure:
+    """Pie chart of SSH failure types from (failure type, count) rows"""
+    fig_failure_types = go.Figure(data=[go.Pie(
+        labels=[failure_type for failure_type, _ in failure_types],
+        values=[count for _, count in failure_types],
+        textinfo='label+value+percent',
+        hovertemplate="<b>%{label}</b><br>Nombre: %{value}<br>Pourcentage: %{percent}<extra></extra>"
+    )])
     
-    .metric-card {
-        background: white;
-        padding: 1rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        border-left: 4px solid #667eea;
-    }
+    fig_failure_types.update_layout(
+        title="Répartition des Types d'Échecs",
+        showlegend=True
+    )
+    return fig_failure_types
+
+@st.cache_resource
+def _ssh_log_state() -> Dict:
+    """Incremental SSH log checkpoint shared across reruns and sessions"""
+    return {'lock': threading.Lock()}
+
+def _fail2ban_log_key() -> Tuple[str, float]:
+    """Path and modification time of the fail2ban log, keying every cache derived from it"""
+    log_path = config.FAIL2BAN_LOG_PATH
+    try:
+        mtime = os.path.getmtime(log_path)
+    except OSError:
+        mtime = 0.0
+    return log_path, mtime
+
+def _log_filter_options(df: pd.DataFrame) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Sorted action and jail filter options of a parsed log frame, always in step with it"""
+    # Categories are already unique and sorted, so this is only a copy
+    return (
+        ('Toutes',) + tuple(df['action'].cat.categories),
+        ('Toutes',) + tuple(df['jail'].cat.categories)
+    )
+
+@st.cache_data(ttl=performance_config.SSH_LOG_CACHE_DURATION, show_spinner=False)
+def _log_frame(log_path: str, mtime: float, lines: int) -> pd.DataFrame:
+    """Parsed fail2ban log as a frame, rebuilt only when the log changes; the mtime argument keys the cache"""
+    # Typed columns straight from the regex, without a dict per entry
+    df = pd.DataFrame(utils.parse_fail2ban_log_array(log_path, lines))
+    # Few distinct actions and jails: categories make the filters work on codes
+    return df.astype({'action': 'category', 'jail': 'category'})
+
+def _format_timestamps(timestamps: pd.Series) -> pd.Series:
+    """Vectorized utils.format_timestamp: fail2ban timestamps without milliseconds, others unchanged"""
+    parsed = pd.to_datetime(timestamps, format='%Y-%m-%d %H:%M:%S,%f', errors='coerce')
+    return parsed.dt.strftime('%Y-%m-%d %H:%M:%S').fillna(timestamps)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _filter_log_rows(_df: pd.DataFrame, log_key: Tuple[str, float, int], action_filter: str, jail_filter: str, ip_filter: str) -> np.ndarray:
+    """Positions of the log rows matching the filters, reused while the log and filters are unchanged"""
+    # The frame is left unhashed: the (path, mtime, lines) key of _log_frame identifies it
+    mask = np.ones(len(_df), dtype=bool)
     
-    .status-active {
-        color: #28a745;
-        font-weight: bold;
-    }
+    if action_filter != 'Toutes':
+        mask &= (_df['action'] == action_filter).to_numpy()
     
-    .status-inactive {
-        color: #dc3545;
-        font-weight: bold;
-    }
+    if jail_filter != 'Toutes':
+        mask &= (_df['jail'] == jail_filter).to_numpy()
     
-    .jail-card {
-        background: #f8f9fa;
-        padding: 1rem;
-        border-radius: 8px;
-        margin: 0.5rem 0;
-        border-left: 4px solid #17a2b8;
-    }
+    if ip_filter:
+        # Plain substring search: the filter is a partial IP, not a pattern
+        mask &= _df['ip'].str.contains(ip_filter, na=False, regex=False).to_numpy(dtype=bool)
     
-    .ip-info {
-        background: #e9ecef;
-        padding: 0.5rem;
-        border-radius: 5px;
-        margin: 0.2rem 0;
-        font-size: 0.9rem;
-    }
-</style>
-""", unsafe_allow_html=True)
+    return np.flatnonzero(mask)
+
+def _load_ssh_entries(log_file: str) -> List[utils.SshEntry]:
+    """Parse the SSH log lines appended since the previous rerun"""
+    state = _ssh_log_state()
+    with state['lock']:
+        return utils.parse_ssh_logs_incremental(log_file, state)
+
+def _sample_ips(ips: pd.Series) -> str:
+    """First three IPs of a jail, with an ellipsis when there are more"""
+    return ', '.join(ips.iloc[:3]) + ('...' if len(ips) > 3 else '')
+
+def _sample_countries(countries: pd.Series) -> str:
+    """First three known countries of a jail, with the count of the others"""
+    known = [country for country in countries.unique() if country not in ('Non disponible', 'Non déterminé')]
+    if not known:
+        return 'Non déterminé'
+    return ', '.join(known[:3]) + (f" (+{len(known) - 3})" if len(known) > 3 else '')
+
+def _join_unique(values: pd.Series) -> str:
+    """Distinct values of a group, in order of first appearance"""
+    return ', '.join(values.unique())
+
+def _failed_attempts_table(attempts_by_ip: Dict[str, List[Dict[str, str]]], geo: Dict[str, Dict]) -> pd.DataFrame:
+    """Per-IP table of failed SSH attempts with geolocation, most active IPs first"""
+    attempts_df = pd.DataFrame.from_records(
+        [
+            (ip, attempt['user'], attempt['failure_type'])
+            for ip, attempts in attempts_by_ip.items() for attempt in attempts
+        ],
+        columns=['IP', 'user', 'failure_type']
+    ).astype({'failure_type': 'category'})
+    table = attempts_df.groupby('IP', sort=False).agg(**{
+        'Utilisateurs Tentés': ('user', _join_unique),
+        'Tentatives': ('user', 'size'),
+        'Type d\'Échec': ('failure_type', _join_unique),
+    })
+    
+    geo_df = pd.DataFrame.from_dict({ip: geo[ip] for ip in table.index}, orient='index')
+    geo_df = geo_df.reindex(columns=['country', 'city', 'isp']).fillna('Non disponible')
+    geo_df.columns = ['Pays', 'Ville', 'ISP']
+    
+    # Few distinct locations per page, so store them as categories
+    table = table.join(geo_df).astype({'Tentatives': 'int32', 'Pays': 'category', 'Ville': 'category', 'ISP': 'category'})
+    table = table.sort_values('Tentatives', ascending=False, kind='stable')
+    return table.rename_axis('IP').reset_index()
+
+class Phase:
+    """Add a render phase's time, excluding nested phases, to st.session_state.phases when profiling"""
+    
+    _active = threading.local()
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.enabled = performance_config.ENABLE_PROFILING
+    
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        self.parent = getattr(Phase._active, 'phase', None)
+        self.nested = 0.0
+        Phase._active.phase = self
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        if not self.enabled:
+            return False
+        elapsed = time.perf_counter() - self.start
+        Phase._active.phase = self.parent
+        if self.parent is not None:
+            self.parent.nested += elapsed
+        # A phase entered several times in one render reports its total
+        phases = st.session_state.setdefault('phases', {})
+        phases[self.name] = phases.get(self.name, 0.0) + elapsed - self.nested
+        return False
+
+# Ban durations and detection periods offered in the forms, in seconds
+DURATION_MAP = {
+    "1 minute": 60,
+    "5 minutes": 300,
+    "10 minutes": 600,
+    "30 minutes": 1800,
+    "1 heure": 3600,
+    "6 heures": 21600,
+    "12 heures": 43200,
+    "24 heures": 86400,
+    "7 jours": 604800
+}
+DURATION_OPTIONS = tuple(DURATION_MAP)
+
+FINDTIME_MAP = {
+    "5 minutes": 300,
+    "10 minutes": 600,
+    "30 minutes": 1800,
+    "1 heure": 3600,
+    "2 heures": 7200,
+    "6 heures": 21600,
+    "12 heures": 43200
+}
+FINDTIME_OPTIONS = tuple(FINDTIME_MAP)
+
+# Display strings of the durations offered above, which cover nearly every configured value
+_TIME_DISPLAY = {
+    60: "1min",
+    300: "5min",
+    600: "10min",
+    1800: "30min",
+    3600: "1h 0min",
+    7200: "2h 0min",
+    21600: "6h 0min",
+    43200: "12h 0min",
+    86400: "24h 0min",
+    604800: "168h 0min"
+}
+
+# UI state restored after a refresh, with its defaults
+_PRESERVED_UI_STATE = (
+    ('show_config_editor', False),
+    ('editing_jail', None),
+    ('auto_refresh', True),
+)
+
+def _run_parallel(*funcs) -> List:
+    """Run independent fetchers concurrently and return their results in order"""
+    # Workers need the script context to use the Streamlit caches
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=len(funcs), initializer=add_script_run_ctx, initargs=(None, ctx)) as executor:
+        futures = [executor.submit(func) for func in funcs]
+        return [future.result() for future in futures]
+
+def _fetch_jail_configs(jail_names: List[str]) -> Dict[str, Dict]:
+    """Configurations of several jails, fetched concurrently"""
+    if not jail_names:
+        return {}
+    return dict(zip(jail_names, _run_parallel(*(partial(_fetch_jail_config, name) for name in jail_names))))
+
+# Color mapping for different jails on the map
+JAIL_COLORS = {
+    'sshd': 'red',
+    'apache-auth': 'blue',
+    'nginx-http-auth': 'green',
+    'postfix': 'orange',
+    'dovecot': 'purple'
+}
+
+# Map legend scaffold, around the per-jail rows
+LEGEND_OPEN = '''
+<div style="position: fixed; 
+            bottom: 50px; left: 50px; width: 150px; height: auto; 
+            background-color: white; border:2px solid grey; z-index:9999; 
+            font-size:14px; padding: 10px">
+<h4 style="margin: 0 0 10px 0;">Légende</h4>
+'''
+LEGEND_CLOSE = '</div>'
+
+class _MapPoint(NamedTuple):
+    """Banned IP placed on the map"""
+    ip: str
+    jail: str
+    lat: float
+    lon: float
+    country: str
+    city: str
+    isp: str
+
+@st.cache_resource(ttl=performance_config.CACHE_DURATION, max_entries=8, show_spinner=False)
+def _build_banned_map(map_data: Tuple[_MapPoint, ...]):
+    """Folium map of the banned IPs; cached as a resource since folium maps don't pickle reliably"""
+    # Create base map centered on world
+    m = folium.Map(
+        location=[20, 0],  # Center of world
+        zoom_start=2,
+        tiles='OpenStreetMap'
+    )
+    
+    # One toggleable layer per jail, each clustering its markers in the browser
+    clusters = {}
+    for jail in dict.fromkeys(data.jail for data in map_data):
+        layer = folium.FeatureGroup(name=jail).add_to(m)
+        clusters[jail] = MarkerCluster().add_to(layer)
+    
+    # Add markers for each IP
+    for data in map_data:
+        jail_color = JAIL_COLORS.get(data.jail, 'gray')
+        
+        # Create popup content
+        popup_content = f"""
+        <div style="width: 200px;">
+            <h4 style="margin: 0; color: {jail_color};">{data.ip}</h4>
+            <hr style="margin: 5px 0;">
+            <b>Jail:</b> {data.jail}<br>
+            <b>Pays:</b> {data.country}<br>
+            <b>Ville:</b> {data.city}<br>
+            <b>ISP:</b> {data.isp}
+        </div>
+        """
+        
+        folium.CircleMarker(
+            location=[data.lat, data.lon],
+            radius=8,
+            popup=folium.Popup(popup_content, max_width=250),
+            color='white',
+            weight=2,
+            fillColor=jail_color,
+            fillOpacity=0.7,
+            tooltip=f"{data.ip} ({data.country})"
+        ).add_to(clusters[data.jail])
+    
+    folium.LayerControl().add_to(m)
+    
+    # Add legend, with one row per jail color
+    legend_rows = ''.join(
+        f'<p style="margin: 5px 0;"><span style="color: {JAIL_COLORS.get(jail, "gray")};">●</span> {jail}</p>'
+        for jail in clusters
+    )
+    m.get_root().html.add_child(folium.Element(LEGEND_OPEN + legend_rows + LEGEND_CLOSE))
+    return m
+
+def _clear_fetch_caches():
+    """Drop cached fail2ban data so the next fetch hits the server, and re-probe the SSH log"""
+    _fetch_is_running.clear()
+    _fetch_jails_status.clear()
+    _fetch_banned_ips.clear()
+    _fetch_jail_config.clear()
+    _fetch_server_status.clear()
+    _get_manager().clear_jails_cache()
+    utils.find_ssh_log_file.cache_clear()
 
 class Fail2ShieldApp:
     """Main application class"""
     
     def __init__(self):
-        self.manager = Fail2banManager()
+        self.manager = _get_manager()
+        # Set by run() once it has refreshed, so the dashboard fragment skips a second pass
+        self._data_refreshed = False
         self.check_system_status()
         self.initialize_session_state()
-        self.initialize_cache()
     
     def check_system_status(self):
         """Check system status and display warnings if needed"""
-        if not self.manager.is_fail2ban_running():
+        if not _fetch_is_running():
             st.error("Fail2ban n'est pas en cours d'exécution. Veuillez démarrer le service fail2ban.")
             st.info("Commande: `sudo systemctl start fail2ban`")
             st.stop()
     
     def initialize_session_state(self):
         """Initialize Streamlit session state variables"""
-        if 'last_update' not in st.session_state:
-            st.session_state.last_update = datetime.now()
-        if 'auto_refresh' not in st.session_state:
-            st.session_state.auto_refresh = True
-        if 'jails_data' not in st.session_state:
-            st.session_state.jails_data = []
-        if 'banned_ips_data' not in st.session_state:
-            st.session_state.banned_ips_data = {}
-        if 'show_config_editor' not in st.session_state:
-            st.session_state.show_config_editor = False
-        if 'editing_jail' not in st.session_state:
-            st.session_state.editing_jail = None
-        if 'data_cache' not in st.session_state:
-            st.session_state.data_cache = {}
-        if 'cache_timestamp' not in st.session_state:
-            st.session_state.cache_timestamp = {}
-        if 'current_tab' not in st.session_state:
-            st.session_state.current_tab = 0
-    
-    def initialize_cache(self):
-        """Initialize caching system"""
-        self.cache_duration = 30  # Cache duration in seconds
-        self.geo_cache_duration = 3600  # Geolocation cache for 1 hour
+        ss = st.session_state
+        # Defaults only need setting once per session, not on every rerun
+        if 'initialized' in ss:
+            return
+        
+        defaults = {
+            'last_update': datetime.now(),
+            'auto_refresh': True,
+            'jails_data': [],
+            'banned_ips_data': {},
+            'bans_df': pd.DataFrame(columns=['jail', 'ip']),
+            'show_config_editor': False,
+            'editing_jail': None,
+        }
+        for key, value in defaults.items():
+            if key not in ss:
+                ss[key] = value
+        ss.initialized = True
     
     def refresh_data(self, force=False):
         """Refresh all data from fail2ban with caching and session preservation"""
         try:
-            current_time = datetime.now()
-            
-            # Check if we need to refresh based on cache
-            if not force and self.is_data_cached('jails_data', current_time):
-                return
+            # Fetchers are TTL-cached; a forced refresh drops them first
+            if force:
+                _clear_fetch_caches()
             
-            # Preserve session state if enabled
-            preserve_session = st.session_state.get('preserve_session', True)
+            # Preserve session state if enabled, snapshotting the UI state before refresh
+            ss = st.session_state
+            preserve_session = ss.get('preserve_session', True)
+            ui_state = {key: ss.get(key, default) for key, default in _PRESERVED_UI_STATE} if preserve_session else None
             
-            # Store current UI state before refresh
-            if preserve_session:
-                ui_state = {
-                    'show_config_editor': st.session_state.get('show_config_editor', False),
-                    'editing_jail': st.session_state.get('editing_jail', None),
-                    'auto_refresh': st.session_state.get('auto_refresh', True)
-                }
-            
-            with st.spinner("Actualisation des données..."):
-                # Refresh jails data
-                st.session_state.jails_data = self.manager.get_all_jails_status()
-                st.session_state.cache_timestamp['jails_data'] = current_time
-                
-                # Refresh banned IPs data
-                st.session_state.banned_ips_data = self.manager.get_banned_ips()
-                st.session_state.cache_timestamp['banned_ips'] = current_time
+            with st.spinner("Actualisation des données..."), Phase("Données fail2ban"):
+                # Jails, banned IPs and the sidebar server status are independent,
+                # so fetch them concurrently; the server status lands in its cache
+                (fetched_at, st.session_state.jails_data), st.session_state.banned_ips_data, _ = _run_parallel(
+                    _fetch_jails_status, _fetch_banned_ips, _fetch_server_status
+                )
+                # Built from the dict just fetched, so both always describe the same bans
+                st.session_state.bans_df = _bans_frame(st.session_state.banned_ips_data)
                 
-                st.session_state.last_update = current_time
+                st.session_state.last_update = fetched_at
                 
                 # Restore UI state if preservation is enabled
-                if preserve_session:
-                    for key, value in ui_state.items():
-                        st.session_state[key] = value
+                if ui_state:
+                    ss.update(ui_state)
                 
         except Exception as e:
             st.error(f"Erreur lors de l'actualisation: {str(e)}")
@@ -165,16 +559,6 @@ class Fail2ShieldApp:
             if not st.session_state.get('preserve_session', True):
                 st.info("Essayez d'activer le 'Mode préservation session' pour éviter les erreurs")
     
-    def is_data_cached(self, data_type, current_time):
-        """Check if data is still valid in cache"""
-        if data_type not in st.session_state.cache_timestamp:
-            return False
-        
-        last_update = st.session_state.cache_timestamp[data_type]
-        time_diff = (current_time - last_update).total_seconds()
-        
-        return time_diff < self.cache_duration
-    
     def render_header(self):
         """Render the main header"""
         st.markdown(f"""
@@ -210,12 +594,14 @@ class Fail2ShieldApp:
                 value=5,
                 help="Fréquence d'actualisation automatique"
             )
-            # Convert minutes to seconds for internal use
-            refresh_interval_seconds = refresh_interval * 60
+            # Convert minutes to seconds for the dashboard fragment
+            st.session_state.refresh_interval_seconds = refresh_interval * 60
+        else:
+            st.session_state.refresh_interval_seconds = None
         
         # System status
         st.sidebar.subheader("État du système")
-        server_status = self.manager.get_server_status()
+        server_status = _fetch_server_status()
         
         if server_status['running']:
             st.sidebar.success("Fail2ban actif")
@@ -241,13 +627,13 @@ class Fail2ShieldApp:
     def render_metrics_overview(self):
         """Render overview metrics"""
         jails_data = st.session_state.jails_data
-        banned_ips_data = st.session_state.banned_ips_data
+        bans_df = st.session_state.bans_df
         
         # Calculate metrics
-        active_jails = len([j for j in jails_data if j.get('enabled', False)])
-        total_failures = sum(j.get('total_failed', 0) for j in jails_data)
-        total_banned_historical = sum(j.get('total_banned', 0) for j in jails_data)
-        currently_banned = sum(len(ips) for ips in banned_ips_data.values())
+        active_jails = sum(1 for j in jails_data if j.enabled)
+        total_failures = sum(j.total_failed for j in jails_data)
+        total_banned_historical = sum(j.total_banned for j in jails_data)
+        currently_banned = len(bans_df)
         
         # Display metrics in columns
         col1, col2, col3, col4 = st.columns(4)
@@ -284,13 +670,25 @@ class Fail2ShieldApp:
         """Render interactive charts"""
         jails_data = st.session_state.jails_data
         banned_ips_data = st.session_state.banned_ips_data
+        bans_df = st.session_state.bans_df
         
         if not jails_data:
             st.warning("Aucune donnée de jail disponible")
             return
-        
+
+        # Resolve each distinct banned IP once, then broadcast the country
+        # columns to every ban through the factorized integer codes
+        with Phase("Géolocalisation"):
+            ip_codes, unique_ips = pd.factorize(bans_df['ip'])
+            geo = _geolocate(unique_ips)
+            unique_geo = [geo[ip] for ip in unique_ips]
+            country_codes = np.array([g.get('country_code', '') for g in unique_geo], dtype=object)
+            country_names = np.array([g.get('country', 'Non déterminé') for g in unique_geo], dtype=object)
+            bans_df = bans_df.assign(country_code=country_codes[ip_codes], country=country_names[ip_codes])
+
         # SSH Connection Analysis
-        self.render_ssh_analysis()
+        with Phase("Analyse SSH"):
+            self.render_ssh_analysis()
         
         st.divider()
         
@@ -300,53 +698,14 @@ class Fail2ShieldApp:
             # Failures by jail chart
             st.subheader("Tentatives d'attaque par Jail")
             
-            jail_names = [j['name'] for j in jails_data if j.get('enabled', False)]
-            jail_failures = [j.get('total_failed', 0) for j in jails_data if j.get('enabled', False)]
-            jail_currently_banned = [j.get('currently_banned', 0) for j in jails_data if j.get('enabled', False)]
+            jail_rows = tuple(
+                (j.name, j.total_failed, j.currently_banned)
+                for j in jails_data if j.enabled
+            )
             
-            if jail_names and any(jail_failures):
+            if jail_rows and any(failures for _, failures, _ in jail_rows):
                 # Create horizontal bar chart with additional info
-                fig_failures = go.Figure()
-                
-                # Add bars for total failures
-                fig_failures.add_trace(go.Bar(
-                    y=jail_names,
-                    x=jail_failures,
-                    name='Tentatives totales',
-                    orientation='h',
-                    marker_color='#dc3545',
-                    text=[f'{val:,}' for val in jail_failures],
-                    textposition='auto',
-                    hovertemplate="<b>%{y}</b><br>Tentatives: %{x:,}<extra></extra>"
-                ))
-                
-                # Add bars for currently banned
-                fig_failures.add_trace(go.Bar(
-                    y=jail_names,
-                    x=jail_currently_banned,
-                    name='IPs bannies actuellement',
-                    orientation='h',
-                    marker_color='#ffc107',
-                    text=[f'{val}' if val > 0 else '' for val in jail_currently_banned],
-                    textposition='auto',
-                    hovertemplate="<b>%{y}</b><br>IPs bannies: %{x}<extra></extra>"
-                ))
-                
-                fig_failures.update_layout(
-                    title="Activité de sécurité par service",
-                    xaxis_title="Nombre",
-                    yaxis_title="Services",
-                    barmode='overlay',
-                    showlegend=True,
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    ),
-                    height=400
-                )
+                fig_failures = _build_failures_fig(jail_rows)
                 
                 st.plotly_chart(fig_failures, use_container_width=True)
             else:
@@ -356,7 +715,7 @@ class Fail2ShieldApp:
             # Banned IPs by jail chart
             st.subheader("IPs Bannies par Jail")
             
-            banned_counts = {jail: len(ips) for jail, ips in banned_ips_data.items() if ips}
+            banned_counts = bans_df.groupby('jail', sort=False).size().to_dict()
             
             # Debug: Check if we have data
             if not banned_counts:
@@ -364,43 +723,11 @@ class Fail2ShieldApp:
                 return
             
             if banned_counts:
-                # Prepare simple data for sunburst chart
-                labels = []
-                parents = []
-                values = []
-                
-                # Add root
-                labels.append("IPs Bannies")
-                parents.append("")
-                values.append(sum(banned_counts.values()))
-                
-                # Add jails as children of root
-                for jail, count in banned_counts.items():
-                    labels.append(jail)
-                    parents.append("IPs Bannies")
-                    values.append(count)
-                    
-                    ips = banned_ips_data[jail]
-                    
-                    # Add IPs directly as children of jails (simplified)
-                    for ip in ips:
-                        labels.append(ip)
-                        parents.append(jail)
-                        values.append(1)
-                
-                # Create simple sunburst chart
-                fig_banned = go.Figure(go.Sunburst(
-                    labels=labels,
-                    parents=parents,
-                    values=values,
-                ))
-                
-                # Update layout for tight margin
-                fig_banned.update_layout(
-                    margin=dict(t=30, l=0, r=0, b=0),
-                    title="Distribution des IPs bannies",
-                    height=400
+                # Hashable snapshot of the bans, so the figure is only rebuilt when they change
+                frozen_items = tuple(
+                    (jail, tuple(ips)) for jail, ips in sorted(banned_ips_data.items()) if ips
                 )
+                fig_banned = _build_sunburst_fig(frozen_items)
                 
                 st.plotly_chart(fig_banned, use_container_width=True)
                 
@@ -415,185 +742,22 @@ class Fail2ShieldApp:
                 
                 with summary_col2:
                     st.write("**Pays:**")
-                    # Country flags mapping
-                    country_flags = {
-                        'France': '🇫🇷',
-                        'Chine': '🇨🇳',
-                        'China': '🇨🇳',
-                        'Russie': '🇷🇺',
-                        'Russia': '🇷🇺',
-                        'États-Unis': '🇺🇸',
-                        'United States': '🇺🇸',
-                        'Allemagne': '🇩🇪',
-                        'Germany': '🇩🇪',
-                        'Brésil': '🇧🇷',
-                        'Brazil': '🇧🇷',
-                        'Inde': '🇮🇳',
-                        'India': '🇮🇳',
-                        'Japon': '🇯🇵',
-                        'Japan': '🇯🇵',
-                        'Royaume-Uni': '🇬🇧',
-                        'United Kingdom': '🇬🇧',
-                        'Canada': '🇨🇦',
-                        'Italie': '🇮🇹',
-                        'Italy': '🇮🇹',
-                        'Espagne': '🇪🇸',
-                        'Spain': '🇪🇸',
-                        'Pays-Bas': '🇳🇱',
-                        'Netherlands': '🇳🇱',
-                        'Corée du Sud': '🇰🇷',
-                        'South Korea': '🇰🇷',
-                        'Australie': '🇦🇺',
-                        'Australia': '🇦🇺',
-                        'Mexique': '🇲🇽',
-                        'Mexico': '🇲🇽',
-                        'Argentine': '🇦🇷',
-                        'Argentina': '🇦🇷',
-                        'Turquie': '🇹🇷',
-                        'Turkey': '🇹🇷',
-                        'Pologne': '🇵🇱',
-                        'Poland': '🇵🇱',
-                        'Ukraine': '🇺🇦',
-                        'Suède': '🇸🇪',
-                        'Sweden': '🇸🇪',
-                        'Norvège': '🇳🇴',
-                        'Norway': '🇳🇴',
-                        'Finlande': '🇫🇮',
-                        'Finland': '🇫🇮',
-                        'Suisse': '🇨🇭',
-                        'Switzerland': '🇨🇭',
-                        'Autriche': '🇦🇹',
-                        'Austria': '🇦🇹',
-                        'Belgique': '🇧🇪',
-                        'Belgium': '🇧🇪',
-                        'Portugal': '🇵🇹',
-                        'Grèce': '🇬🇷',
-                        'Greece': '🇬🇷',
-                        'République tchèque': '🇨🇿',
-                        'Czech Republic': '🇨🇿',
-                        'Hongrie': '🇭🇺',
-                        'Hungary': '🇭🇺',
-                        'Roumanie': '🇷🇴',
-                        'Romania': '🇷🇴',
-                        'Bulgarie': '🇧🇬',
-                        'Bulgaria': '🇧🇬',
-                        'Croatie': '🇭🇷',
-                        'Croatia': '🇭🇷',
-                        'Slovénie': '🇸🇮',
-                        'Slovenia': '🇸🇮',
-                        'Slovaquie': '🇸🇰',
-                        'Slovakia': '🇸🇰',
-                        'Estonie': '🇪🇪',
-                        'Estonia': '🇪🇪',
-                        'Lettonie': '🇱🇻',
-                        'Latvia': '🇱🇻',
-                        'Lituanie': '🇱🇹',
-                        'Lithuania': '🇱🇹',
-                        'Iran': '🇮🇷',
-                        'Irak': '🇮🇶',
-                        'Iraq': '🇮🇶',
-                        'Israël': '🇮🇱',
-                        'Israel': '🇮🇱',
-                        'Arabie Saoudite': '🇸🇦',
-                        'Saudi Arabia': '🇸🇦',
-                        'Émirats arabes unis': '🇦🇪',
-                        'United Arab Emirates': '🇦🇪',
-                        'Égypte': '🇪🇬',
-                        'Egypt': '🇪🇬',
-                        'Afrique du Sud': '🇿🇦',
-                        'South Africa': '🇿🇦',
-                        'Nigeria': '🇳🇬',
-                        'Kenya': '🇰🇪',
-                        'Maroc': '🇲🇦',
-                        'Morocco': '🇲🇦',
-                        'Algérie': '🇩🇿',
-                        'Algeria': '🇩🇿',
-                        'Tunisie': '🇹🇳',
-                        'Tunisia': '🇹🇳',
-                        'Thaïlande': '🇹🇭',
-                        'Thailand': '🇹🇭',
-                        'Vietnam': '🇻🇳',
-                        'Singapour': '🇸🇬',
-                        'Singapore': '🇸🇬',
-                        'Malaisie': '🇲🇾',
-                        'Malaysia': '🇲🇾',
-                        'Indonésie': '🇮🇩',
-                        'Indonesia': '🇮🇩',
-                        'Philippines': '🇵🇭',
-                        'Pakistan': '🇵🇰',
-                        'Bangladesh': '🇧🇩',
-                        'Sri Lanka': '🇱🇰',
-                        'Myanmar': '🇲🇲',
-                        'Cambodge': '🇰🇭',
-                        'Cambodia': '🇰🇭',
-                        'Laos': '🇱🇦',
-                        'Mongolie': '🇲🇳',
-                        'Mongolia': '🇲🇳',
-                        'Kazakhstan': '🇰🇿',
-                        'Ouzbékistan': '🇺🇿',
-                        'Uzbekistan': '🇺🇿',
-                        'Kirghizistan': '🇰🇬',
-                        'Kyrgyzstan': '🇰🇬',
-                        'Tadjikistan': '🇹🇯',
-                        'Tajikistan': '🇹🇯',
-                        'Turkménistan': '🇹🇲',
-                        'Turkmenistan': '🇹🇲',
-                        'Azerbaïdjan': '🇦🇿',
-                        'Azerbaijan': '🇦🇿',
-                        'Arménie': '🇦🇲',
-                        'Armenia': '🇦🇲',
-                        'Géorgie': '🇬🇪',
-                        'Georgia': '🇬🇪',
-                        'Biélorussie': '🇧🇾',
-                        'Belarus': '🇧🇾',
-                        'Moldavie': '🇲🇩',
-                        'Moldova': '🇲🇩',
-                        'Non déterminé': '🏴‍☠️',
-                        'Unknown': '🏴‍☠️',
-                        'Réseau Local': '🏠',
-                        'Réseau Privé': '🏠',
-                        'Non disponible': '❓'
-                    }
-                    
                     # Show countries that appear in the data
-                    data_countries = {}
-                    for ips in banned_ips_data.values():
-                        for ip in ips:
-                            geo_info = utils.get_ip_geolocation(ip)
-                            country = geo_info.get('country', 'Non déterminé') if geo_info else 'Non déterminé'
-                            data_countries[country] = data_countries.get(country, 0) + 1
+                    data_countries = bans_df.groupby(['country_code', 'country'], sort=False).size().sort_values(ascending=False)
                     
-                    for country, count in sorted(data_countries.items(), key=lambda x: x[1], reverse=True):
-                        flag = country_flags.get(country, '🌍')  # Default globe emoji
-                        st.write(f"{flag} {country}: {count} IPs")
+                    for (country_code, country), count in data_countries.items():
+                        st.write(f"{utils.get_country_flag(country_code, country)} {country}: {count} IPs")
                 
                 # Add summary table below the chart
                 st.write("**Résumé détaillé:**")
-                summary_data = []
-                for jail, count in banned_counts.items():
-                    ips = banned_ips_data[jail]
-                    
-                    # Get countries for this jail
-                    countries = []
-                    for ip in ips:
-                        geo_info = utils.get_ip_geolocation(ip)
-                        country = geo_info.get('country', 'Non disponible') if geo_info else 'Non disponible'
-                        if country not in countries and country != 'Non disponible':
-                            countries.append(country)
-                    
-                    countries_str = ', '.join(countries[:3])
-                    if len(countries) > 3:
-                        countries_str += f" (+{len(countries)-3})"
-                    
-                    summary_data.append({
-                        'Service': jail,
-                        'IPs Bannies': count,
-                        'IPs': ', '.join(ips[:3]) + ('...' if len(ips) > 3 else ''),
-                        'Pays': countries_str if countries_str else 'Non déterminé'
-                    })
-                
-                df_summary = pd.DataFrame(summary_data)
-                st.dataframe(df_summary, use_container_width=True, hide_index=True)
+                df_summary = bans_df.groupby('jail', sort=False).agg(
+                    count=('ip', 'size'),
+                    ips=('ip', _sample_ips),
+                    countries=('country', _sample_countries)
+                ).reset_index()
+                df_summary.columns = ['Service', 'IPs Bannies', 'IPs', 'Pays']
+                # A few static rows: a plain table is lighter than the interactive grid
+                st.table(df_summary.set_index('Service'))
             else:
                 st.info("Aucune IP actuellement bannie")
     
@@ -614,7 +778,8 @@ class Fail2ShieldApp:
             st.info(f"Analyse du fichier : {log_file}")
             
             # Parse SSH logs
-            ssh_entries = utils.parse_ssh_logs(log_file)
+            with Phase("Lecture logs SSH"):
+                ssh_entries = _load_ssh_entries(log_file)
             
             if not ssh_entries:
                 st.warning("Aucune donnée SSH trouvée dans les logs récents")
@@ -623,6 +788,9 @@ class Fail2ShieldApp:
             
             # Get SSH statistics
             ssh_stats = utils.get_ssh_connection_stats(ssh_entries)
+
+            # Resolve each IP once; attacking IPs are a subset of the failed ones
+            geo = _geolocate(set(ssh_stats['accepted']) | set(ssh_stats['failed']) | set(ssh_stats['failed_password']))
             
             # Display metrics
             col1, col2, col3, col4 = st.columns(4)
@@ -683,32 +851,20 @@ class Fail2ShieldApp:
             with chart_col2:
                 # Top attacking IPs
                 if ssh_stats['top_attacking_ips']:
-                    top_attackers = dict(sorted(ssh_stats['top_attacking_ips'].items(), 
-                                               key=lambda x: x[1], reverse=True)[:10])
+                    top_attackers = dict(nlargest(10, ssh_stats['top_attacking_ips'].items(), key=itemgetter(1)))
                     
                     # Create hover text with geolocation
                     hover_texts = []
                     for ip in top_attackers.keys():
-                        geo_info = utils.get_ip_geolocation(ip)
+                        geo_info = geo[ip]
                         if geo_info:
                             hover_text = f"<b>{ip}</b><br>Tentatives: {top_attackers[ip]}<br>Pays: {geo_info.get('country', 'Unknown')}<br>Ville: {geo_info.get('city', 'Unknown')}<br>ISP: {geo_info.get('isp', 'Unknown')}"
                         else:
                             hover_text = f"<b>{ip}</b><br>Tentatives: {top_attackers[ip]}<br>Géolocalisation: Non disponible"
                         hover_texts.append(hover_text)
                     
-                    fig_attackers = go.Figure(data=[go.Bar(
-                        x=list(top_attackers.keys()),
-                        y=list(top_attackers.values()),
-                        marker_color='#dc3545',
-                        hovertemplate="%{customdata}<extra></extra>",
-                        customdata=hover_texts
-                    )])
-                    
-                    fig_attackers.update_layout(
-                        title="Top 10 IPs Attaquantes",
-                        xaxis_title="Adresses IP",
-                        yaxis_title="Nombre de tentatives",
-                        xaxis_tickangle=-45
+                    fig_attackers = _build_attackers_fig(
+                        tuple(zip(top_attackers.keys(), top_attackers.values(), hover_texts))
                     )
                     
                     st.plotly_chart(fig_attackers, use_container_width=True)
@@ -725,7 +881,7 @@ class Fail2ShieldApp:
                     if ssh_stats['accepted']:
                         accepted_data = []
                         for ip, users in ssh_stats['accepted'].items():
-                            geo_info = utils.get_ip_geolocation(ip)
+                            geo_info = geo[ip]
                             accepted_data.append({
                                 'IP': ip,
                                 'Utilisateurs': ', '.join(set(users)),
@@ -742,50 +898,14 @@ class Fail2ShieldApp:
                 
                 with tab2:
                     if ssh_stats['failed_password']:
-                        password_failed_data = []
-                        for ip, attempts in ssh_stats['failed_password'].items():
-                            geo_info = utils.get_ip_geolocation(ip)
-                            users = [attempt['user'] for attempt in attempts]
-                            failure_types = [attempt['failure_type'] for attempt in attempts]
-                            
-                            password_failed_data.append({
-                                'IP': ip,
-                                'Utilisateurs Tentés': ', '.join(set(users)),
-                                'Tentatives': len(attempts),
-                                'Type d\'Échec': ', '.join(set(failure_types)),
-                                'Pays': geo_info.get('country', 'Non disponible'),
-                                'Ville': geo_info.get('city', 'Non disponible'),
-                                'ISP': geo_info.get('isp', 'Non disponible')
-                            })
-                        
-                        df_password_failed = pd.DataFrame(password_failed_data)
-                        # Sort by number of attempts (descending)
-                        df_password_failed = df_password_failed.sort_values('Tentatives', ascending=False)
+                        df_password_failed = _failed_attempts_table(ssh_stats['failed_password'], geo)
                         st.dataframe(df_password_failed, use_container_width=True, hide_index=True)
                     else:
                         st.info("Aucun échec de mot de passe récent")
                 
                 with tab3:
                     if ssh_stats['failed']:
-                        other_failed_data = []
-                        for ip, attempts in ssh_stats['failed'].items():
-                            geo_info = utils.get_ip_geolocation(ip)
-                            users = [attempt['user'] if isinstance(attempt, dict) else attempt for attempt in attempts]
-                            failure_types = [attempt['failure_type'] if isinstance(attempt, dict) else 'Autre échec' for attempt in attempts]
-                            
-                            other_failed_data.append({
-                                'IP': ip,
-                                'Utilisateurs Tentés': ', '.join(set(users)),
-                                'Tentatives': len(attempts),
-                                'Type d\'Échec': ', '.join(set(failure_types)),
-                                'Pays': geo_info.get('country', 'Non disponible'),
-                                'Ville': geo_info.get('city', 'Non disponible'),
-                                'ISP': geo_info.get('isp', 'Non disponible')
-                            })
-                        
-                        df_other_failed = pd.DataFrame(other_failed_data)
-                        # Sort by number of attempts (descending)
-                        df_other_failed = df_other_failed.sort_values('Tentatives', ascending=False)
+                        df_other_failed = _failed_attempts_table(ssh_stats['failed'], geo)
                         st.dataframe(df_other_failed, use_container_width=True, hide_index=True)
                     else:
                         st.info("Aucune autre tentative échouée récente")
@@ -796,9 +916,7 @@ class Fail2ShieldApp:
                     with user_col1:
                         st.write("**Utilisateurs - Connexions Réussies**")
                         if ssh_stats['top_users_accepted']:
-                            users_accepted = dict(sorted(ssh_stats['top_users_accepted'].items(), 
-                                                       key=lambda x: x[1], reverse=True))
-                            for user, count in list(users_accepted.items())[:10]:
+                            for user, count in nlargest(10, ssh_stats['top_users_accepted'].items(), key=itemgetter(1)):
                                 st.write(f"• {user}: {count} connexions")
                         else:
                             st.info("Aucune donnée")
@@ -806,9 +924,7 @@ class Fail2ShieldApp:
                     with user_col2:
                         st.write("**Utilisateurs - Tentatives Échouées**")
                         if ssh_stats['top_users_failed']:
-                            users_failed = dict(sorted(ssh_stats['top_users_failed'].items(), 
-                                                     key=lambda x: x[1], reverse=True))
-                            for user, count in list(users_failed.items())[:10]:
+                            for user, count in nlargest(10, ssh_stats['top_users_failed'].items(), key=itemgetter(1)):
                                 st.write(f"• {user}: {count} tentatives")
                         else:
                             st.info("Aucune donnée")
@@ -820,130 +936,73 @@ class Fail2ShieldApp:
                     
                     with failure_col1:
                         # Failure types pie chart
-                        fig_failure_types = go.Figure(data=[go.Pie(
-                            labels=list(ssh_stats['failure_types'].keys()),
-                            values=list(ssh_stats['failure_types'].values()),
-                            textinfo='label+value+percent',
-                            hovertemplate="<b>%{label}</b><br>Nombre: %{value}<br>Pourcentage: %{percent}<extra></extra>"
-                        )])
-                        
-                        fig_failure_types.update_layout(
-                            title="Répartition des Types d'Échecs",
-                            showlegend=True
-                        )
-                        
+                        fig_failure_types = _build_failure_types_fig(tuple(sorted(ssh_stats['failure_types'].items())))
                         st.plotly_chart(fig_failure_types, use_container_width=True)
                     
                     with failure_col2:
                         st.write("**Statistiques des Échecs**")
-                        for failure_type, count in sorted(ssh_stats['failure_types'].items(), 
-                                                         key=lambda x: x[1], reverse=True):
-                            percentage = round((count / ssh_stats['total_failed']) * 100, 1) if ssh_stats['total_failed'] > 0 else 0
+                        # Failure types exist only when something failed, so the fallback never skews a rate
+                        total_failed = ssh_stats['total_failed'] or 1
+                        for failure_type, count in ssh_stats['failure_types'].most_common():
+                            percentage = round((count / total_failed) * 100, 1)
                             st.write(f"• **{failure_type}**: {count} ({percentage}%)")
                         
-                        if ssh_stats.get('total_failed_password', 0) > 0:
+                        total_failed_password = ssh_stats.get('total_failed_password', 0)
+                        if total_failed_password > 0:
                             st.write("---")
-                            st.write(f"**Total échecs de mot de passe**: {ssh_stats['total_failed_password']}")
-                            password_rate = round((ssh_stats['total_failed_password'] / ssh_stats['total_failed']) * 100, 1) if ssh_stats['total_failed'] > 0 else 0
+                            st.write(f"**Total échecs de mot de passe**: {total_failed_password}")
+                            password_rate = round((total_failed_password / total_failed) * 100, 1)
                             st.write(f"**Pourcentage des échecs**: {password_rate}%")
         
         except Exception as e:
             st.error(f"Erreur lors de l'analyse SSH: {str(e)}")
             st.info("Vérifiez que le fichier /var/log/auth.log est accessible")
     
-    def render_banned_ips_map(self, banned_ips_data):
-        """Render interactive map of banned IPs"""
+    def render_banned_ips_map(self, banned_ips_data, geo_map=None):
+        """Render interactive map of banned IPs, reusing precomputed geolocation when given"""
         if not MAP_AVAILABLE:
             st.error("Modules de cartographie non disponibles")
             return
             
         st.subheader("Carte Géographique des IPs Bannies")
         
-        # Collect all IPs with geolocation
+        # Resolve every IP up front, then collect the ones with geolocation
+        if geo_map is None:
+            geo_map = _geolocate(ip for ips in banned_ips_data.values() for ip in ips)
+        geo_hits = {ip: g for ip, g in geo_map.items() if g and g.get('lat') and g.get('lon')}
         map_data = []
         for jail_name, ips in banned_ips_data.items():
-            if ips:
-                for ip in ips:
-                    geo_info = utils.get_ip_geolocation(ip)
-                    if geo_info and geo_info.get('lat', 0) != 0 and geo_info.get('lon', 0) != 0:
-                        map_data.append({
-                            'ip': ip,
-                            'jail': jail_name,
-                            'lat': geo_info.get('lat', 0),
-                            'lon': geo_info.get('lon', 0),
-                            'country': geo_info.get('country', 'Non déterminé'),
-                            'city': geo_info.get('city', 'Non déterminé'),
-                            'isp': geo_info.get('isp', 'Non déterminé')
-                        })
+            for ip in ips:
+                if ip not in geo_hits:
+                    continue
+                geo_info = geo_hits[ip]
+                map_data.append(_MapPoint(
+                    ip=ip,
+                    jail=jail_name,
+                    lat=geo_info['lat'],
+                    lon=geo_info['lon'],
+                    country=geo_info.get('country', 'Non déterminé'),
+                    city=geo_info.get('city', 'Non déterminé'),
+                    isp=geo_info.get('isp', 'Non déterminé')
+                ))
         
         if not map_data:
             st.warning("Aucune IP avec géolocalisation disponible pour afficher sur la carte")
             return
         
-        # Create base map centered on world
-        m = folium.Map(
-            location=[20, 0],  # Center of world
-            zoom_start=2,
-            tiles='OpenStreetMap'
-        )
-        
-        # Color mapping for different jails
-        jail_colors = {
-            'sshd': 'red',
-            'apache-auth': 'blue', 
-            'nginx-http-auth': 'green',
-            'postfix': 'orange',
-            'dovecot': 'purple'
-        }
-        
-        # Add markers for each IP
-        for data in map_data:
-            jail_color = jail_colors.get(data['jail'], 'gray')
-            
-            # Create popup content
-            popup_content = f"""
-            <div style="width: 200px;">
-                <h4 style="margin: 0; color: {jail_color};">{data['ip']}</h4>
-                <hr style="margin: 5px 0;">
-                <b>Jail:</b> {data['jail']}<br>
-                <b>Pays:</b> {data['country']}<br>
-                <b>Ville:</b> {data['city']}<br>
-                <b>ISP:</b> {data['isp']}
-            </div>
-            """
-            
-            folium.CircleMarker(
-                location=[data['lat'], data['lon']],
-                radius=8,
-                popup=folium.Popup(popup_content, max_width=250),
-                color='white',
-                weight=2,
-                fillColor=jail_color,
-                fillOpacity=0.7,
-                tooltip=f"{data['ip']} ({data['country']})"
-            ).add_to(m)
-        
-        # Add legend
-        legend_html = '''
-        <div style="position: fixed; 
-                    bottom: 50px; left: 50px; width: 150px; height: auto; 
-                    background-color: white; border:2px solid grey; z-index:9999; 
-                    font-size:14px; padding: 10px">
-        <h4 style="margin: 0 0 10px 0;">Légende</h4>
-        '''
-        
-        # Add jail colors to legend
-        unique_jails = set(data['jail'] for data in map_data)
-        for jail in unique_jails:
-            color = jail_colors.get(jail, 'gray')
-            legend_html += f'<p style="margin: 5px 0;"><span style="color: {color};">●</span> {jail}</p>'
-        
-        legend_html += '</div>'
-        m.get_root().html.add_child(folium.Element(legend_html))
+        # The points are hashable, so identical bans reuse the built map
+        m = _build_banned_map(tuple(map_data))
         
         # Display map
         map_data_result = st_folium(m, width=700, height=500)
         
+        # Gather every statistic in a single pass over the points
+        country_counts = Counter()
+        jails = set()
+        for data in map_data:
+            country_counts[data.country] += 1
+            jails.add(data.jail)
+        
         # Show statistics
         col1, col2, col3 = st.columns(3)
         
@@ -951,25 +1010,15 @@ class Fail2ShieldApp:
             st.metric("IPs sur la carte", len(map_data))
         
         with col2:
-            countries = set(data['country'] for data in map_data)
-            st.metric("Pays représentés", len(countries))
+            st.metric("Pays représentés", len(country_counts))
         
         with col3:
-            jails = set(data['jail'] for data in map_data)
             st.metric("Jails concernées", len(jails))
         
         # Show country distribution
         if len(map_data) > 0:
             st.write("**Répartition par pays:**")
-            country_counts = {}
-            for data in map_data:
-                country = data['country']
-                country_counts[country] = country_counts.get(country, 0) + 1
-            
-            # Sort by count
-            sorted_countries = sorted(country_counts.items(), key=lambda x: x[1], reverse=True)
-            
-            for country, count in sorted_countries[:10]:  # Top 10
+            for country, count in country_counts.most_common(10):  # Top 10
                 percentage = round((count / len(map_data)) * 100, 1)
                 st.write(f"• {country}: {count} IPs ({percentage}%)")
     
@@ -995,23 +1044,12 @@ class Fail2ShieldApp:
                 if ban_type == "Temporaire":
                     ban_duration = st.selectbox(
                         "Durée",
-                        ["1 minute", "5 minutes", "10 minutes", "30 minutes", "1 heure", "6 heures", "12 heures", "24 heures", "7 jours"],
+                        DURATION_OPTIONS,
                         index=4,  # Default to 1 hour
                         key=f"ban_duration_{jail_name}"
                     )
                     
-                    duration_map = {
-                        "1 minute": 60,
-                        "5 minutes": 300,
-                        "10 minutes": 600,
-                        "30 minutes": 1800,
-                        "1 heure": 3600,
-                        "6 heures": 21600,
-                        "12 heures": 43200,
-                        "24 heures": 86400,
-                        "7 jours": 604800
-                    }
-                    bantime_value = duration_map[ban_duration]
+                    bantime_value = DURATION_MAP[ban_duration]
                 else:
                     bantime_value = -1
                     st.info("Bannissement permanent activé")
@@ -1031,22 +1069,13 @@ class Fail2ShieldApp:
                 st.write("**Période de détection:**")
                 findtime_option = st.selectbox(
                     "Période",
-                    ["5 minutes", "10 minutes", "30 minutes", "1 heure", "2 heures", "6 heures", "12 heures"],
+                    FINDTIME_OPTIONS,
                     index=3,  # Default to 1 hour
                     key=f"findtime_{jail_name}",
                     help="Période pendant laquelle compter les tentatives"
                 )
                 
-                findtime_map = {
-                    "5 minutes": 300,
-                    "10 minutes": 600,
-                    "30 minutes": 1800,
-                    "1 heure": 3600,
-                    "2 heures": 7200,
-                    "6 heures": 21600,
-                    "12 heures": 43200
-                }
-                findtime_value = findtime_map[findtime_option]
+                findtime_value = FINDTIME_MAP[findtime_option]
                 
                 # Preview
                 st.write("**Aperçu:**")
@@ -1076,10 +1105,8 @@ class Fail2ShieldApp:
                 if st.form_submit_button("Sauvegarder", use_container_width=True):
                     success = self.save_jail_config(jail_name, bantime_value, maxretry_value, findtime_value)
                     if success:
-                        st.success("Configuration sauvegardée avec succès!")
                         st.session_state.show_config_editor = False
-                        # Force data refresh without rerun
-                        self.refresh_data(force=True)
+                        self.apply_change("Configuration sauvegardée avec succès!")
                     else:
                         st.error("Erreur lors de la sauvegarde")
             
@@ -1092,30 +1119,28 @@ class Fail2ShieldApp:
                 if st.form_submit_button("Réinitialiser", use_container_width=True):
                     success = self.reset_jail_config(jail_name)
                     if success:
-                        st.success("Configuration réinitialisée!")
                         st.session_state.show_config_editor = False
-                        # Force data refresh without rerun
-                        self.refresh_data(force=True)
+                        self.apply_change("Configuration réinitialisée!")
                     else:
                         st.error("Erreur lors de la réinitialisation")
     
+    def apply_change(self, message):
+        """Refresh after a ban, unban or config change and rerun the whole app, not just the tab's fragment"""
+        self.refresh_data(force=True)
+        # The message would be lost in the rerun; run() shows it once
+        st.session_state.change_message = message
+        st.rerun(scope="app")
+    
     def save_jail_config(self, jail_name, bantime, maxretry, findtime):
         """Save jail configuration"""
         try:
-            # Apply configuration changes
-            success1, _, _ = utils.safe_execute_command([
-                self.manager.client_path, 'set', jail_name, 'bantime', str(bantime)
-            ])
-            
-            success2, _, _ = utils.safe_execute_command([
-                self.manager.client_path, 'set', jail_name, 'maxretry', str(maxretry)
-            ])
+            # Apply configuration changes; the three settings are independent
+            results = _run_parallel(*(
+                partial(utils.safe_execute_command, [self.manager.client_path, 'set', jail_name, param, str(value)])
+                for param, value in (('bantime', bantime), ('maxretry', maxretry), ('findtime', findtime))
+            ))
             
-            success3, _, _ = utils.safe_execute_command([
-                self.manager.client_path, 'set', jail_name, 'findtime', str(findtime)
-            ])
-            
-            return success1 and success2 and success3
+            return all(success for success, _, _ in results)
         except Exception as e:
             st.error(f"Erreur lors de la sauvegarde: {e}")
             return False
@@ -1137,6 +1162,9 @@ class Fail2ShieldApp:
         
         try:
             time_int = int(time_value)
+            cached = _TIME_DISPLAY.get(time_int)
+            if cached is not None:
+                return cached
             if time_int == -1 and not is_findtime:
                 return "Permanent"
             elif time_int == 0:
@@ -1170,37 +1198,39 @@ class Fail2ShieldApp:
             st.warning("Aucune jail configurée")
             return
         
+        jail_configs = _fetch_jail_configs([jail.name for jail in jails_data if jail.enabled])
+        
         for jail in jails_data:
-            with st.expander(f"{jail['name']}", expanded=False):
+            with st.expander(f"{jail.name}", expanded=False):
                 col1, col2, col3 = st.columns([2, 1, 1])
                 
                 with col1:
                     # Jail status and info
-                    status_color = "status-active" if jail.get('enabled', False) else "status-inactive"
-                    status_text = "Actif" if jail.get('enabled', False) else "Inactif"
+                    status_color = "status-active" if jail.enabled else "status-inactive"
+                    status_text = "Actif" if jail.enabled else "Inactif"
                     
                     st.markdown(f"""
                     <div class="jail-card">
-                        <h4>{jail['name']}</h4>
+                        <h4>{jail.name}</h4>
                         <p><strong>Statut:</strong> <span class="{status_color}">{status_text}</span></p>
-                        <p><strong>Filtre:</strong> {jail.get('filter', 'N/A')}</p>
-                        <p><strong>Actions:</strong> {', '.join(jail.get('actions', []))}</p>
+                        <p><strong>Filtre:</strong> {jail.filter or 'N/A'}</p>
+                        <p><strong>Actions:</strong> {', '.join(jail.actions) or 'N/A'}</p>
                     </div>
                     """, unsafe_allow_html=True)
                 
                 with col2:
                     # Current metrics
-                    st.metric("Échecs actuels", jail.get('currently_failed', 0))
-                    st.metric("Bannies actuelles", jail.get('currently_banned', 0))
+                    st.metric("Échecs actuels", jail.currently_failed)
+                    st.metric("Bannies actuelles", jail.currently_banned)
                 
                 with col3:
                     # Historical metrics
-                    st.metric("Total échecs", jail.get('total_failed', 0))
-                    st.metric("Total bannies", jail.get('total_banned', 0))
+                    st.metric("Total échecs", jail.total_failed)
+                    st.metric("Total bannies", jail.total_banned)
                 
                 # Jail configuration
-                if jail.get('enabled', False):
-                    config_data = self.manager.get_jail_config(jail['name'])
+                if jail.enabled:
+                    config_data = jail_configs[jail.name]
                     if config_data:
                         st.write("**Configuration:**")
                         config_cols = st.columns(len(config_data))
@@ -1216,11 +1246,7 @@ class Fail2ShieldApp:
         st.write("### Bannissement et Configuration")
         
         # Get jail configurations for ban times
-        jail_configs = {}
-        for jail_data in st.session_state.jails_data:
-            if jail_data.get('enabled', False):
-                config_data = self.manager.get_jail_config(jail_data['name'])
-                jail_configs[jail_data['name']] = config_data
+        jail_configs = _fetch_jail_configs([j.name for j in st.session_state.jails_data if j.enabled])
         
         # Main interface
         col1, col2 = st.columns([1, 1])
@@ -1229,7 +1255,7 @@ class Fail2ShieldApp:
             st.write("**Bannissement d'IP:**")
             ip_to_ban = st.text_input("Adresse IP à bannir", placeholder="192.168.1.100")
             
-            active_jails = [j['name'] for j in st.session_state.jails_data if j.get('enabled', False)]
+            active_jails = [j.name for j in st.session_state.jails_data if j.enabled]
             if active_jails:
                 selected_jail = st.selectbox("Jail cible", active_jails)
             else:
@@ -1247,15 +1273,10 @@ class Fail2ShieldApp:
             if ban_type == "Temporaire personnalisé":
                 custom_duration = st.selectbox(
                     "Durée personnalisée",
-                    ["1 minute", "5 minutes", "10 minutes", "30 minutes", "1 heure", "6 heures", "12 heures", "24 heures", "7 jours"],
+                    DURATION_OPTIONS,
                     index=4
                 )
-                duration_map = {
-                    "1 minute": 60, "5 minutes": 300, "10 minutes": 600, "30 minutes": 1800,
-                    "1 heure": 3600, "6 heures": 21600, "12 heures": 43200, 
-                    "24 heures": 86400, "7 jours": 604800
-                }
-                custom_bantime = duration_map[custom_duration]
+                custom_bantime = DURATION_MAP[custom_duration]
             else:
                 custom_bantime = None
         
@@ -1290,9 +1311,7 @@ class Fail2ShieldApp:
                     if utils.validate_ip_address(ip_to_ban):
                         success, message = self.execute_ban(selected_jail, ip_to_ban, ban_type, custom_bantime)
                         if success:
-                            st.success(f"{message}")
-                            self.refresh_data(force=True)
-                            # Data refreshed without rerun to preserve tab
+                            self.apply_change(message)
                         else:
                             st.error(f"{message}")
                     else:
@@ -1311,6 +1330,9 @@ class Fail2ShieldApp:
             st.info("Aucune IP actuellement bannie")
             return
         
+        # Resolve every banned IP once for both the map and the detailed list
+        geo_map = _geolocate(ip for ips in banned_ips_data.values() for ip in ips)
+        
         # Add map view option
         if MAP_AVAILABLE:
             view_option = st.radio(
@@ -1320,7 +1342,7 @@ class Fail2ShieldApp:
             )
             
             if view_option == "Carte géographique":
-                self.render_banned_ips_map(banned_ips_data)
+                self.render_banned_ips_map(banned_ips_data, geo_map=geo_map)
                 st.divider()
         else:
             st.info("Mode carte non disponible. Installez les dépendances: pip install folium streamlit-folium")
@@ -1338,7 +1360,7 @@ class Fail2ShieldApp:
                         
                         with col2:
                             # Get geolocation info
-                            geo_info = utils.get_ip_geolocation(ip)
+                            geo_info = geo_map[ip]
                             if geo_info:
                                 st.markdown(f"""
                                 <div class="ip-info">
@@ -1353,9 +1375,7 @@ class Fail2ShieldApp:
                             if st.button(f"Débannir", key=f"unban_{jail_name}_{ip}"):
                                 success, message = self.manager.unban_ip(jail_name, ip)
                                 if success:
-                                    st.success(message)
-                                    self.refresh_data(force=True)
-                                    # Data refreshed without rerun to preserve tab
+                                    self.apply_change(message)
                                 else:
                                     st.error(message)
     
@@ -1371,128 +1391,144 @@ class Fail2ShieldApp:
         
         with col2:
             if st.button("Actualiser les logs"):
-                # Force refresh without rerun to preserve tab state
-                st.session_state.cache_timestamp.pop('logs', None)
+                # Force a re-read even if the file looks unchanged
+                _log_frame.clear()
+                _filter_log_rows.clear()
                 st.success("Logs actualisés !")
         
         # Parse and display logs
         try:
-            log_entries = utils.parse_fail2ban_log(config.FAIL2BAN_LOG_PATH, lines_to_read)
+            log_path, mtime = _fail2ban_log_key()
+            log_key = (log_path, mtime, lines_to_read)
+            df = _log_frame(*log_key)
             
-            if log_entries:
-                # Convert to DataFrame for better display
-                df = pd.DataFrame(log_entries)
-                
-                # Filter options
-                st.write("### Filtres")
-                filter_col1, filter_col2, filter_col3 = st.columns(3)
-                
-                with filter_col1:
-                    action_filter = st.selectbox(
-                        "Action", 
-                        ['Toutes'] + list(df['action'].unique()) if 'action' in df.columns else ['Toutes']
-                    )
-                
-                with filter_col2:
-                    jail_filter = st.selectbox(
-                        "Jail", 
-                        ['Toutes'] + list(df['jail'].unique()) if 'jail' in df.columns else ['Toutes']
-                    )
-                
-                with filter_col3:
-                    ip_filter = st.text_input("IP (partielle)", placeholder="192.168")
-                
-                # Apply filters
-                filtered_df = df.copy()
-                
-                if action_filter != 'Toutes':
-                    filtered_df = filtered_df[filtered_df['action'] == action_filter]
-                
-                if jail_filter != 'Toutes':
-                    filtered_df = filtered_df[filtered_df['jail'] == jail_filter]
+            if not df.empty:
+                action_options, jail_options = _log_filter_options(df)
+                # Filter widgets rerun only this fragment, never the parsing above
+                st.fragment(self.render_log_table)(df, log_key, action_options, jail_options)
+            else:
+                st.warning("Aucun log trouvé ou erreur de lecture")
                 
-                if ip_filter:
-                    filtered_df = filtered_df[filtered_df['ip'].str.contains(ip_filter, na=False)]
+        except Exception as e:
+            st.error(f"Erreur lors de la lecture des logs: {str(e)}")
+    
+    def render_log_table(self, df, log_key, action_options, jail_options):
+        """Render log filters and the filtered, paginated log table"""
+        try:
+            # Filter options
+            st.write("### Filtres")
+            filter_col1, filter_col2, filter_col3 = st.columns(3)
+            
+            with filter_col1:
+                action_filter = st.selectbox("Action", action_options)
+            
+            with filter_col2:
+                jail_filter = st.selectbox("Jail", jail_options)
+            
+            with filter_col3:
+                ip_filter = st.text_input("IP (partielle)", placeholder="192.168")
+            
+            # Apply filters
+            filtered_df = df.iloc[_filter_log_rows(df, log_key, action_filter, jail_filter, ip_filter)]
+            
+            # Display filtered logs
+            st.write(f"### Logs ({len(filtered_df)} entrées)")
+            
+            if not filtered_df.empty:
+                # Only the current page is formatted and sent to the browser
+                page_size = performance_config.LOG_PAGE_SIZE
+                page_count = (len(filtered_df) - 1) // page_size + 1
+                page = 1
+                if page_count > 1:
+                    page = st.number_input(f"Page (sur {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+                page_df = filtered_df.iloc[(page - 1) * page_size:page * page_size]
                 
-                # Display filtered logs
-                st.write(f"### Logs ({len(filtered_df)} entrées)")
+                # Format timestamp for display on the displayed columns only
+                display_df = page_df[['timestamp', 'jail', 'action', 'ip']].assign(
+                    timestamp=_format_timestamps(page_df['timestamp'])
+                )
                 
-                if not filtered_df.empty:
-                    # Format timestamp for display
-                    display_df = filtered_df.copy()
-                    display_df['timestamp'] = display_df['timestamp'].apply(utils.format_timestamp)
-                    
-                    st.dataframe(
-                        display_df[['timestamp', 'jail', 'action', 'ip']],
-                        use_container_width=True,
-                        hide_index=True
-                    )
-                else:
-                    st.info("Aucune entrée correspondant aux filtres")
+                st.dataframe(
+                    display_df,
+                    use_container_width=True,
+                    hide_index=True
+                )
             else:
-                st.warning("Aucun log trouvé ou erreur de lecture")
+                st.info("Aucune entrée correspondant aux filtres")
                 
         except Exception as e:
             st.error(f"Erreur lors de la lecture des logs: {str(e)}")
     
     def run(self):
         """Main application runner"""
+        # Timings describe this render only
+        st.session_state.phases = {}
+        
         self.render_header()
         
         # Sidebar
         auto_refresh = self.render_sidebar()
         
-        # Auto-refresh logic with intelligent caching
-        if auto_refresh:
-            # Use the configured interval (default 5 minutes)
-            interval = refresh_interval_seconds if 'refresh_interval_seconds' in locals() else 300
-            # Check if it's time to refresh
-            time_since_update = datetime.now() - st.session_state.last_update
-            if time_since_update.total_seconds() >= interval:
-                # Only refresh if cache is expired and no user interaction is happening
-                if not self.is_data_cached('jails_data', datetime.now()):
-                    # Silent refresh without UI disruption
-                    self.refresh_data(force=False)
-        
         # Check if fail2ban is still running
-        if not self.manager.is_fail2ban_running():
+        if not _fetch_is_running():
             st.error("Fail2ban s'est arrêté. Veuillez redémarrer le service.")
             st.stop()
         
-        # Initial data load with cache check
-        if not st.session_state.jails_data or not self.is_data_cached('jails_data', datetime.now()):
-            self.refresh_data()
-        
-        # Main content tabs with state preservation
-        tab_names = ["Dashboard", "Jails", "IPs Bannies", "Logs"]
+        # Load data; the cached fetchers only query fail2ban once their TTL expires
+        self.refresh_data()
+        self._data_refreshed = True
         
-        # Create tabs but don't use the returned objects directly
-        selected_tab = st.radio(
-            "Navigation",
-            tab_names,
-            index=st.session_state.current_tab,
-            horizontal=True,
-            key="tab_selector"
-        )
+        # Outcome of the change that triggered this rerun
+        if 'change_message' in st.session_state:
+            st.success(st.session_state.pop('change_message'))
         
-        # Update current tab index
-        st.session_state.current_tab = tab_names.index(selected_tab)
+        # Main content tabs; the browser keeps the selected tab across reruns
+        dashboard_tab, jails_tab, ips_tab, logs_tab = st.tabs(["Dashboard", "Jails", "IPs Bannies", "Logs"])
         
-        # Render content based on selected tab
-        if selected_tab == "Dashboard":
+        # Each tab is its own fragment, so a widget in one tab reruns only that tab.
+        # st.tabs still renders every tab body on a full rerun.
+        with dashboard_tab:
             self.render_dashboard_content()
-        elif selected_tab == "Jails":
-            self.render_jails_management()
-        elif selected_tab == "IPs Bannies":
-            self.render_ip_management()
-        elif selected_tab == "Logs":
-            self.render_logs_viewer()
+        with jails_tab:
+            st.fragment(self.render_jails_management)()
+        with ips_tab:
+            st.fragment(self.render_ip_management)()
+        with logs_tab:
+            st.fragment(self.render_logs_viewer)()
+        
+        if performance_config.ENABLE_PROFILING:
+            self.render_profiling_panel()
+    
+    def render_profiling_panel(self):
+        """Render the per-phase timings of the last render in the sidebar"""
+        phases = st.session_state.get('phases')
+        if not phases:
+            return
+        
+        with st.sidebar.expander("🧪 Profilage"):
+            timings = pd.Series(phases, name='Durée (ms)').sort_values(ascending=False) * 1000
+            df_phases = timings.to_frame()
+            df_phases['Part (%)'] = timings / timings.sum() * 100
+            st.table(df_phases.round(1))
+            st.caption(f"Total: {timings.sum():.0f} ms")
         
     def render_dashboard_content(self):
         """Render dashboard tab content"""
-        self.render_metrics_overview()
-        st.divider()
-        self.render_charts()
+        # Auto-refresh reruns only this fragment, not the header, sidebar and tabs
+        @st.fragment(run_every=st.session_state.get('refresh_interval_seconds'))
+        def dashboard_fragment():
+            # run() already refreshed on a full rerun; a timed rerun of this fragment
+            # alone keeps the last run's app instance, with the flag cleared below
+            if not self._data_refreshed:
+                self.refresh_data()
+            self._data_refreshed = False
+            with Phase("Métriques"):
+                self.render_metrics_overview()
+            st.divider()
+            with Phase("Graphiques"):
+                self.render_charts()
+        
+        dashboard_fragment()
 
 def main():
     """Main entry point"""
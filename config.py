@@ -8,6 +8,8 @@ import os
 FAIL2BAN_CLIENT_PATH = "/usr/bin/fail2ban-client"
 FAIL2BAN_LOG_PATH = "/var/log/fail2ban.log"
 FAIL2BAN_CONFIG_PATH = "/etc/fail2ban/"
+FAIL2BAN_DB_PATH = "/var/lib/fail2ban/fail2ban.sqlite3"
+FAIL2BAN_SOCKET_PATH = "/var/run/fail2ban/fail2ban.sock"
 
 # Application settings
 APP_TITLE = "Fail2Shield Dashboard"
@@ -17,6 +19,7 @@ COMMAND_TIMEOUT = 10  # seconds
 
 # API settings
 IP_API_URL = "http://ip-api.com/json/"
+IP_API_BATCH_URL = "http://ip-api.com/batch"
 IP_API_TIMEOUT = 5  # seconds
 
 # UI Theme colors
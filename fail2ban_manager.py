@@ -4,12 +4,152 @@ Fail2ban Manager - Core class for interacting with fail2ban system
 
 import subprocess
 import json
+import pickle
 import re
-from typing import Dict, List, Optional, Tuple
+import socket
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime
 import config
+import performance_config
 import utils
 
+_INT_RE = re.compile(r'\d+')
+
+# Every labelled line of `fail2ban-client status <jail>`, matched in one pass
+_STATUS_RE = re.compile(
+    r'(?P<key>File list|Journal matches|Currently failed|Total failed|Currently banned|Total banned|Banned IP list):'
+    r'[ \t]*(?P<val>.*?)[ \t]*$',
+    re.M
+)
+
+def _status_count(value: str) -> Optional[int]:
+    """
+    Extract the counter of a status line
+    
+    Args:
+        value (str): Text after the label
+        
+    Returns:
+        Optional[int]: The first number in the text, or None if there is none
+    """
+    match = _INT_RE.search(value)
+    return int(match.group()) if match else None
+
+def _split_jail_list(jail_list: str) -> List[str]:
+    """
+    Split the comma separated jail list of `fail2ban-client status`
+    
+    Args:
+        jail_list (str): Text after the "Jail list:" label
+        
+    Returns:
+        List[str]: Jail names; they never contain spaces or commas
+    """
+    return jail_list.replace(',', ' ').split()
+
+# Jail status field and value parser for each status label
+_STATUS_FIELDS = {
+    'File list': ('filter', str),
+    'Journal matches': ('filter', str),
+    'Currently failed': ('currently_failed', _status_count),
+    'Total failed': ('total_failed', _status_count),
+    'Currently banned': ('currently_banned', _status_count),
+    'Total banned': ('total_banned', _status_count),
+    'Banned IP list': ('banned_ips', lambda value: tuple(value.split())),
+}
+
+def _format_config_value(param: str, value) -> str:
+    """
+    Render a socket `get` reply the way fail2ban-client prints it
+    
+    Args:
+        param (str): Name of the queried parameter
+        value: Reply data
+        
+    Returns:
+        str: Parameter value as fail2ban-client would print it
+    """
+    if param != 'logpath':
+        return str(value)
+    
+    if not value:
+        return "No file is currently monitored"
+    paths = [str(path) for path in value]
+    return "\n".join(["Current monitored log file(s):"] + ["|- " + path for path in paths[:-1]] + ["`- " + paths[-1]])
+
+class JailStatus(NamedTuple):
+    """
+    Status of a single jail, as reported by fail2ban-client
+    """
+    name: str
+    enabled: bool
+    filter: str = ''
+    actions: Tuple[str, ...] = ()
+    currently_failed: int = 0
+    total_failed: int = 0
+    currently_banned: int = 0
+    total_banned: int = 0
+    banned_ips: Tuple[str, ...] = ()
+    error: str = ''
+
+# Framing markers of the fail2ban client/server socket protocol
+_CSPROTO_END = b"<F2B_END_COMMAND>"
+_CSPROTO_CLOSE = b"<F2B_CLOSE_COMMAND>"
+
+class Fail2banSocket:
+    """
+    Minimal client for the fail2ban server socket, sending several commands over one connection
+    """
+    
+    def __init__(self, socket_path: str, timeout: float):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(socket_path)
+        except OSError:
+            self._sock.close()
+            raise
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def send(self, *command: str) -> Tuple[int, object]:
+        """
+        Send one command and wait for the server reply
+        
+        Args:
+            *command (str): Command words, as given to fail2ban-client
+            
+        Returns:
+            Tuple[int, object]: (return code, reply data)
+        """
+        self._sock.sendall(pickle.dumps([str(word) for word in command], pickle.HIGHEST_PROTOCOL) + _CSPROTO_END)
+        
+        reply = bytearray()
+        while not reply.endswith(_CSPROTO_END):
+            chunk = self._sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("fail2ban socket closed")
+            reply += chunk
+        return pickle.loads(reply[:-len(_CSPROTO_END)])
+    
+    def close(self):
+        """
+        Tell the server the session is over and close the connection
+        """
+        try:
+            self._sock.sendall(_CSPROTO_CLOSE + _CSPROTO_END)
+        except OSError:
+            pass
+        finally:
+            self._sock.close()
+
 class Fail2banManager:
     """
     Manager class for interacting with fail2ban system
@@ -18,6 +158,10 @@ class Fail2banManager:
     def __init__(self):
         self.client_path = config.FAIL2BAN_CLIENT_PATH
         self.timeout = config.COMMAND_TIMEOUT
+        self.db_path = config.FAIL2BAN_DB_PATH
+        self.socket_path = config.FAIL2BAN_SOCKET_PATH
+        # (monotonic time, jail names) of the last successful jail listing
+        self._jails_cache: Optional[Tuple[float, List[str]]] = None
     
     def is_fail2ban_running(self) -> bool:
         """
@@ -36,6 +180,11 @@ class Fail2banManager:
         Returns:
             List[str]: List of jail names
         """
+        # The jail set rarely changes, so reuse a recent listing
+        cached = self._jails_cache
+        if cached is not None and time.monotonic() - cached[0] < performance_config.CACHE_DURATION:
+            return list(cached[1])
+        
         success, stdout, stderr = utils.safe_execute_command([self.client_path, 'status'])
         
         if not success:
@@ -47,14 +196,19 @@ class Fail2banManager:
         for line in lines:
             if 'Jail list:' in line:
                 # Extract jail names from the line
-                jail_part = line.split('Jail list:')[1].strip()
-                if jail_part:
-                    jails = [jail.strip() for jail in jail_part.split(',') if jail.strip()]
+                jails = _split_jail_list(line.split('Jail list:')[1])
                 break
         
-        return jails
+        self._jails_cache = (time.monotonic(), jails)
+        return list(jails)
     
-    def get_jail_status(self, jail_name: str) -> Dict:
+    def clear_jails_cache(self):
+        """
+        Forget the cached jail listing so the next call queries fail2ban
+        """
+        self._jails_cache = None
+    
+    def get_jail_status(self, jail_name: str) -> JailStatus:
         """
         Get detailed status of a specific jail
         
@@ -62,81 +216,179 @@ class Fail2banManager:
             jail_name (str): Name of the jail
             
         Returns:
-            Dict: Jail status information
+            JailStatus: Jail status information
         """
         success, stdout, stderr = utils.safe_execute_command([self.client_path, 'status', jail_name])
         
         if not success:
-            return {
-                'name': jail_name,
-                'enabled': False,
-                'error': stderr or 'Failed to get jail status'
-            }
+            return JailStatus(
+                name=jail_name,
+                enabled=False,
+                error=stderr or 'Failed to get jail status'
+            )
         
-        status = {
-            'name': jail_name,
-            'enabled': True,
-            'filter': '',
-            'actions': [],
-            'currently_failed': 0,
-            'total_failed': 0,
-            'currently_banned': 0,
-            'total_banned': 0,
-            'banned_ips': []
-        }
+        status = {}
         
-        lines = stdout.split('\n')
+        for match in _STATUS_RE.finditer(stdout):
+            field, parse = _STATUS_FIELDS[match.group('key')]
+            value = parse(match.group('val'))
+            if value is not None:
+                status[field] = value
         
-        for line in lines:
-            line = line.strip()
+        return JailStatus(name=jail_name, enabled=True, **status)
+    
+    def _parse_status_reply(self, jail_name: str, code: int, data, actions_reply: Tuple[int, object]) -> JailStatus:
+        """
+        Build a jail status from socket replies to `status <jail>` and `get <jail> actions`
+        
+        Args:
+            jail_name (str): Name of the jail
+            code (int): Return code of the status command
+            data: Status reply data, nested (label, value) pairs
+            actions_reply (Tuple[int, object]): Return code and action names of the jail
+            
+        Returns:
+            JailStatus: Jail status information
+        """
+        if code != 0:
+            return JailStatus(
+                name=jail_name,
+                enabled=False,
+                error=str(data) or 'Failed to get jail status'
+            )
+        
+        sections = dict(data)
+        filter_info = dict(sections.get('Filter', ()))
+        actions_info = dict(sections.get('Actions', ()))
+        # The filter section names what the jail watches: log files or journal matches
+        sources = filter_info.get('File list') or filter_info.get('Journal matches') or ()
+        actions_code, actions = actions_reply
+        
+        return JailStatus(
+            name=jail_name,
+            enabled=True,
+            filter=' '.join(str(source) for source in sources),
+            actions=tuple(str(action) for action in actions) if actions_code == 0 and actions else (),
+            currently_failed=int(filter_info.get('Currently failed', 0)),
+            total_failed=int(filter_info.get('Total failed', 0)),
+            currently_banned=int(actions_info.get('Currently banned', 0)),
+            total_banned=int(actions_info.get('Total banned', 0)),
+            banned_ips=tuple(str(ip) for ip in actions_info.get('Banned IP list', ()))
+        )
+    
+    def _socket_batch(self, *commands: List[str], stop_on_error: bool = False) -> Optional[List[Tuple[int, object]]]:
+        """
+        Send several commands over one fail2ban socket connection
+        
+        Args:
+            *commands (List[str]): Commands, as the words given to fail2ban-client
+            stop_on_error (bool): Skip the remaining commands once one fails
             
-            if 'Filter' in line and ':' in line:
-                status['filter'] = line.split(':', 1)[1].strip()
-            elif 'Actions' in line and ':' in line:
-                actions_str = line.split(':', 1)[1].strip()
-                status['actions'] = [action.strip() for action in actions_str.split(',') if action.strip()]
-            elif 'Currently failed:' in line:
-                try:
-                    status['currently_failed'] = int(re.search(r'\d+', line).group())
-                except:
-                    pass
-            elif 'Total failed:' in line:
-                try:
-                    status['total_failed'] = int(re.search(r'\d+', line).group())
-                except:
-                    pass
-            elif 'Currently banned:' in line:
-                try:
-                    status['currently_banned'] = int(re.search(r'\d+', line).group())
-                except:
-                    pass
-            elif 'Total banned:' in line:
-                try:
-                    status['total_banned'] = int(re.search(r'\d+', line).group())
-                except:
-                    pass
-            elif 'Banned IP list:' in line:
-                ips_str = line.split(':', 1)[1].strip()
-                if ips_str:
-                    status['banned_ips'] = [ip.strip() for ip in ips_str.split() if ip.strip()]
-        
-        return status
+        Returns:
+            Optional[List[Tuple[int, object]]]: (return code, reply data) of each
+            command sent, or None if the socket is missing or unusable
+        """
+        try:
+            with Fail2banSocket(self.socket_path, self.timeout) as client:
+                replies = []
+                for command in commands:
+                    replies.append(client.send(*command))
+                    if stop_on_error and replies[-1][0] != 0:
+                        break
+                return replies
+        except Exception:
+            # Connection, permission, timeout or unpickling errors
+            return None
     
-    def get_all_jails_status(self) -> List[Dict]:
+    def _socket_jails_status(self) -> Optional[List[JailStatus]]:
+        """
+        Query the jail list and every jail status over one fail2ban socket connection
+        
+        Returns:
+            Optional[List[JailStatus]]: List of jail status information, or None
+            if the socket is missing or unusable
+        """
+        try:
+            with Fail2banSocket(self.socket_path, self.timeout) as client:
+                code, data = client.send('status')
+                if code != 0:
+                    return None
+                
+                jails = _split_jail_list(dict(data).get('Jail list', ''))
+                
+                # Action names are not part of the status reply, so ask for them on the same connection
+                return [
+                    self._parse_status_reply(jail, *client.send('status', jail), client.send('get', jail, 'actions'))
+                    for jail in jails
+                ]
+        except Exception:
+            # Connection, permission, timeout or unpickling errors
+            return None
+    
+    def get_all_jails_status(self) -> List[JailStatus]:
         """
         Get status of all jails
         
         Returns:
-            List[Dict]: List of jail status information
+            List[JailStatus]: List of jail status information
         """
+        # Prefer one socket session; fall back to one client process per jail
+        statuses = self._socket_jails_status()
+        if statuses is not None:
+            return statuses
+        
         jails = self.get_jails_list()
-        jails_status = []
+        return self._jails_status(jails)
+    
+    def _jails_status(self, jails: List[str]) -> List[JailStatus]:
+        """
+        Get status of several jails, one concurrent client process per jail
+        
+        Args:
+            jails (List[str]): Jail names
+            
+        Returns:
+            List[JailStatus]: Jail status information, in the order of `jails`
+        """
+        if not jails:
+            return []
+        
+        # Each call mostly waits on fail2ban, so threads overlap the processes
+        with ThreadPoolExecutor(max_workers=min(len(jails), performance_config.MAX_CONCURRENT_REQUESTS)) as executor:
+            return list(executor.map(self.get_jail_status, jails))
+    
+    def _bulk_status(self) -> Optional[Dict[str, List[str]]]:
+        """
+        Read currently banned IPs of all enabled jails from the fail2ban database
         
-        for jail in jails:
-            status = self.get_jail_status(jail)
-            jails_status.append(status)
+        One read-only query replaces a `fail2ban-client status <jail>` call per jail.
         
-        return jails_status
+        Returns:
+            Optional[Dict[str, List[str]]]: Jail names mapped to banned IPs, or None
+            if the database is missing or unreadable
+        """
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=self.timeout)
+        except sqlite3.Error:
+            return None
+        
+        try:
+            banned_ips = {name: [] for (name,) in conn.execute("SELECT name FROM jails WHERE enabled = 1")}
+            
+            # Same "still banned" condition fail2ban uses to restore bans
+            rows = conn.execute(
+                "SELECT jail, ip FROM bips WHERE bantime < 0 OR timeofban + bantime > ? ORDER BY timeofban",
+                (int(time.time()),)
+            )
+            for jail, ip in rows:
+                if jail in banned_ips:
+                    banned_ips[jail].append(ip)
+            
+            return banned_ips
+        except sqlite3.Error:
+            return None
+        finally:
+            conn.close()
     
     def get_banned_ips(self, jail_name: str = None) -> Dict[str, List[str]]:
         """
@@ -153,12 +405,18 @@ class Fail2banManager:
         if jail_name:
             jails = [jail_name]
         else:
+            # Prefer the database, then the socket; fall back to one status call per jail
+            bulk = self._bulk_status()
+            if bulk is not None:
+                return bulk
+            statuses = self._socket_jails_status()
+            if statuses is not None:
+                return {status.name: list(status.banned_ips) for status in statuses if status.enabled}
             jails = self.get_jails_list()
         
-        for jail in jails:
-            status = self.get_jail_status(jail)
-            if status.get('enabled', False):
-                banned_ips[jail] = status.get('banned_ips', [])
+        for status in self._jails_status(jails):
+            if status.enabled:
+                banned_ips[status.name] = list(status.banned_ips)
         
         return banned_ips
     
@@ -210,24 +468,28 @@ class Fail2banManager:
         jail_name = utils.sanitize_input(jail_name)
         ip_address = utils.sanitize_input(ip_address)
         
-        # For permanent ban, set a very long time or use banip directly
-        if ban_time == -1:
-            # Try to set bantime to -1 (permanent) then ban
-            utils.safe_execute_command([
-                self.client_path, 'set', jail_name, 'bantime', '-1'
-            ])
-            success, stdout, stderr = utils.safe_execute_command([
-                self.client_path, 'set', jail_name, 'banip', ip_address
-            ])
-        else:
-            # Set custom ban time then ban
-            utils.safe_execute_command([
-                self.client_path, 'set', jail_name, 'bantime', str(ban_time)
-            ])
-            success, stdout, stderr = utils.safe_execute_command([
-                self.client_path, 'set', jail_name, 'banip', ip_address
-            ])
+        # Set the ban time (-1 is permanent) then ban, in one socket session when possible
+        set_bantime = ['set', jail_name, 'bantime', str(ban_time)]
+        ban = ['set', jail_name, 'banip', ip_address]
         
+        # The ban is only sent once the ban time is set, on either path
+        replies = self._socket_batch(set_bantime, ban, stop_on_error=True)
+        if replies is not None:
+            results = [(code == 0, '' if code == 0 else str(data)) for code, data in replies]
+        else:
+            results = []
+            for command in (set_bantime, ban):
+                success, stdout, stderr = utils.safe_execute_command([self.client_path] + command)
+                results.append((success, stderr))
+                if not success:
+                    break
+        
+        bantime_set, stderr = results[0]
+        if not bantime_set:
+            message = f"Failed to set ban time {ban_time} in jail {jail_name}, {ip_address} was not banned"
+            return False, f"{message}: {stderr}" if stderr else message
+        
+        success, stderr = results[-1]
         if success:
             ban_type = "permanently" if ban_time == -1 else f"for {ban_time} seconds"
             return True, f"Successfully banned {ip_address} {ban_type} in jail {jail_name}"
@@ -277,6 +539,7 @@ class Fail2banManager:
         success, stdout, stderr = utils.safe_execute_command([
             self.client_path, 'reload', jail_name
         ])
+        self.clear_jails_cache()
         
         if success:
             return True, f"Successfully reloaded jail {jail_name}"
@@ -298,6 +561,7 @@ class Fail2banManager:
         success, stdout, stderr = utils.safe_execute_command([
             self.client_path, 'start', jail_name
         ])
+        self.clear_jails_cache()
         
         if success:
             return True, f"Successfully started jail {jail_name}"
@@ -319,6 +583,7 @@ class Fail2banManager:
         success, stdout, stderr = utils.safe_execute_command([
             self.client_path, 'stop', jail_name
         ])
+        self.clear_jails_cache()
         
         if success:
             return True, f"Successfully stopped jail {jail_name}"
@@ -340,20 +605,34 @@ class Fail2banManager:
         # Common configuration parameters to query
         params = ['bantime', 'findtime', 'maxretry', 'logpath', 'backend']
         
-        for param in params:
-            success, stdout, stderr = utils.safe_execute_command([
-                self.client_path, 'get', jail_name, param
-            ])
-            
-            if success:
-                config_params[param] = stdout.strip()
+        # One socket session for every parameter when possible
+        replies = self._socket_batch(*(['get', jail_name, param] for param in params))
+        if replies is not None:
+            for param, (code, data) in zip(params, replies):
+                if code == 0:
+                    config_params[param] = _format_config_value(param, data)
+            return config_params
+        
+        # Otherwise one client process per parameter, run concurrently
+        with ThreadPoolExecutor(max_workers=min(len(params), performance_config.MAX_CONCURRENT_REQUESTS)) as executor:
+            results = executor.map(
+                utils.safe_execute_command,
+                ([self.client_path, 'get', jail_name, param] for param in params)
+            )
+            for param, (success, stdout, stderr) in zip(params, results):
+                if success:
+                    config_params[param] = stdout.strip()
         
         return config_params
     
-    def get_server_status(self) -> Dict:
+    def get_server_status(self, jails: Optional[List[JailStatus]] = None) -> Dict:
         """
         Get overall fail2ban server status
         
+        Args:
+            jails (List[JailStatus], optional): Status of all jails, when the
+                caller already fetched it
+            
         Returns:
             Dict: Server status information
         """
@@ -371,9 +650,10 @@ class Fail2banManager:
             if success:
                 status['version'] = stdout.strip()
             
-            # Get jail statistics
-            jails = self.get_all_jails_status()
+            # Get jail statistics, reusing the caller's statuses when given
+            if jails is None:
+                jails = self.get_all_jails_status()
             status['total_jails'] = len(jails)
-            status['active_jails'] = len([j for j in jails if j.get('enabled', False)])
+            status['active_jails'] = sum(1 for j in jails if j.enabled)
         
         return status
\ No newline at end of file
@@ -16,8 +16,12 @@ BATCH_SIZE = 10  # Process IPs in batches
 ENABLE_AUTO_REFRESH = True
 AUTO_REFRESH_INTERVAL = 60  # Increase interval to reduce load
 LAZY_LOAD_GEOLOCATION = True  # Load geolocation on demand
+LOG_PAGE_SIZE = 100  # Log rows rendered per page
 
 # API optimization
 IP_API_BATCH_SIZE = 5  # Process geolocation in batches
 IP_API_TIMEOUT = 3  # Reduce timeout for faster response
-MAX_CONCURRENT_REQUESTS = 3  # Limit concurrent API calls
\ No newline at end of file
+MAX_CONCURRENT_REQUESTS = 3  # Limit concurrent API calls
+
+# Diagnostics
+ENABLE_PROFILING = False  # Show per-phase render timings in the sidebar
@@ -139,7 +139,7 @@ install_dependencies() {
 check_application_files() {
     print_status "Checking application files..."
 
-    required_files=("app.py" "config.py" "utils.py" "fail2ban_manager.py")
+    required_files=("app.py" "config.py" "utils.py" "fail2ban_manager.py" "assets/styles.css")
 
     for file in "${required_files[@]}"; do
         if [ ! -f "$file" ]; then